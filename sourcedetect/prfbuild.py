@@ -1,145 +1,259 @@
-import numpy as np
-import os
-
-
-class PrfBuild:
-    """Create a training or test set of simulated TESS images containing both 'real' and 'false' sources"""
-
-    def __init__(self,Xtrain,ytrain,run=True):
-        """
-        Initialise
-        
-        Parameters
-        ----------
-        Xtrain : str
-            TESS prf arrays to be added into the training/test sets  
-        ytrain : str
-            TESS prf arrays to be added into the training/test sets (positive/negative sources can either share a label or have different labels)
-        
-        Options
-        -------
-        run : bool
-            if true (default) then the training/test set will be built upon calling PrfBuild rather 
-            than just defining the prfs and corresponding labels 
-        """
-        self.Xtrain = Xtrain
-        self.ytrain = ytrain
-        self.directory = os.path.dirname(os.path.abspath(__file__)) + '/'
-        if type(self.Xtrain) == str:
-            self.Xtrain = np.load(self.directory+'training_data.npy',allow_pickle=True)
-        if type(self.ytrain) == str:
-            self.ytrain = np.load(self.directory+'training_labels.npy',allow_pickle=True)
-        if run==True:
-            self.make_data()
-
-
-    def make_labels(self,X,y,num):
-        """
-        Places true/false sources into the training/test array with randomly assigned positions and updates
-        the label arrays accordingly (this is called once per training/test image)
-        
-        Parameters
-        ----------
-        X : array
-            training/test dataset template with background but no sources 
-        y : array
-            training/test dataset labels template (np.zeros array)
-        num : int
-            maximum number of true/false sources in each image
-        
-        Returns
-        -------
-        positions : list
-            list of tuples corresponding to the coordinates of the true/false sources
-        """
-        
-        positions = []
-
-        for _ in range(num):
-            placed = False
-            while placed == False:
-                try:
-                    idx = np.random.randint(len(self.Xtrain))
-                    number = self.Xtrain[idx]
-                    class_, offset_x, offset_y, w, h = int(self.ytrain[idx][0]), int(self.ytrain[idx][1]), int(self.ytrain[idx][2]), int(self.ytrain[idx][3]), int(self.ytrain[idx][4])
-                    px, py = np.random.randint(2,int(self.x_shape[0]-2)), np.random.randint(2,int(self.x_shape[1]-2))
-                    # mx, my = (px+2) // self.grid_size, (py+2) // self.grid_size
-                    mx, my = px//self.grid_size, py//self.grid_size
-                    output = y[my][mx]
-
-                    #prevent multiple generations from overlapping
-                    if output[0] > 0:
-                        continue
-                    overlap = False
-                    for i,j in positions:
-                        if i in range(py+-2,py+3) and j in range(px-2,px+3):
-                        # if i in range(py+offset_y+2,py+offset_y+3) and j in range(px+offset_x-2,px+offset_x+3):
-                            overlap = True
-                    if overlap == True:
-                        continue
-
-                    # X[py-h//2:py+(h-h//2),px-w//2:px+(w-w//2),0] = number
-                    # if class_ != 3:
-                    #     X[py-h//2:py+(h-h//2),px-w//2:px+(w-w//2),0] *= np.max((np.random.rand()*2.5)+0.5)
-                    # px, py = px + offset_x, py + offset_y
-                    
-                    output[0] = 1.0
-                    # output[1] = px - (mx * self.grid_size)  # x1
-                    # output[2] = py - (my * self.grid_size)  # y1
-                    output[1] = px % self.grid_size  # Object grid x index
-                    output[2] = py % self.grid_size  # Object grid y index
-                    output[3] = w # Object width
-                    output[4] = h # Object height
-                    output[5 + class_] = 1.0
-
-                    X[py-h//2:py+(h-h//2),px-w//2:px+(w-w//2),0] = number
-                    if class_ != 3:
-                        X[py-h//2:py+(h-h//2),px-w//2:px+(w-w//2),0] *= np.max((np.random.rand()*2.5)+0.5) #0.75+np.random.rand()*(3*np.std(X[:,:,0])-0.75)
-                    if class_ < 2:
-                        positions.append((py,px))
-                    placed = True
-                except:
-                    pass
-        return positions    
-        
-
-    def make_data(self,x_shape=(16,16),y_shape=(4,4),size=64,num=2):
-        """
-        Creates the template training/test dataset and label arrays and saves the positions of the real/false sources.
-        
-        Parameters
-        ----------
-        x_shape : tuple (default (16,16))
-            shape of the training/test images 
-        y_shape : tuple (default (4,4))
-            shape of the object position/size/label output 
-        size : int (default 64) 
-            number of training/test images
-        num : int (default 2)
-            maximum number of true/false sources in each image
-        
-        Outputs
-        -------
-        sources : list
-            positions (as tuples) of the sources in the image
-        X : array
-            training/test images
-        y : array
-            labels corresponding to the training/test images (labels for object position, size, likelihood, and probability of positive/negative/false source)
-        """
-        
-        self.x_shape = x_shape
-        self.y_shape = y_shape
-        self.grid_size = int(x_shape[0]/y_shape[0])
-
-        X = np.zeros((size, self.x_shape[0], self.x_shape[1], 1), dtype=np.float32)
-        y = np.zeros((size, self.y_shape[0], self.y_shape[1], 9), dtype=np.float32)
-        positions = []
-
-        for i in range(size):
-            X[i] += np.random.normal(0,np.random.rand()*0.2+0.4,(x_shape[0], x_shape[1], 1))
-            positions.append(self.make_labels(X[i],y[i],num=num))
-            
-        self.sources = sorted(positions)[0]
-        self.X = X
-        self.y = y
+import numpy as np
+import os
+
+try:
+    from numba import njit, prange
+except ImportError:
+    def njit(*args,**kwargs):
+        """Fallback decorator that leaves functions uncompiled when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        def wrapper(func):
+            return func
+        return wrapper
+    prange = range
+
+
+@njit(cache=True)
+def _place_sources(X,y,prfs,labels,idxs,cell_u,offxs,offys,scales,grid_size,pos_out):
+    """
+    Sequential source-placement loop for a single image (compiled by numba when available).
+    Each source is assigned a free grid cell directly (so occupied cells never waste a draw)
+    with its pixel position derived from the pre-drawn in-cell offset. Writes the prf stamps
+    into X and the detection labels into y, records the coordinates of the real sources in
+    pos_out, and returns how many were recorded
+    """
+    gy, gx = y.shape[0], y.shape[1]
+    H, W = X.shape[0], X.shape[1]
+    n = 0
+    for k in range(len(idxs)):
+        idx = idxs[k]
+        class_ = labels[idx,0]
+        w = labels[idx,3]
+        h = labels[idx,4]
+
+        #pick the target'th free cell rather than rejecting draws that land on occupied ones
+        free = 0
+        for yy in range(gy):
+            for xx in range(gx):
+                if y[yy,xx,0] == 0:
+                    free += 1
+        if free == 0:
+            break
+        target = int(cell_u[k]*free)
+        if target >= free:
+            target = free-1
+        my, mx = -1, -1
+        for yy in range(gy):
+            if my >= 0:
+                break
+            for xx in range(gx):
+                if y[yy,xx,0] == 0:
+                    if target == 0:
+                        my, mx = yy, xx
+                        break
+                    target -= 1
+
+        #pixel position within the chosen cell, keeping the 2 pixel border margin
+        lox = max(mx*grid_size,2)
+        hix = min((mx+1)*grid_size-1,W-3)
+        loy = max(my*grid_size,2)
+        hiy = min((my+1)*grid_size-1,H-3)
+        if hix < lox or hiy < loy:
+            continue
+        px = lox + offxs[k] % (hix-lox+1)
+        py = loy + offys[k] % (hiy-loy+1)
+
+        #prevent multiple generations from overlapping
+        overlap = False
+        for t in range(n):
+            if py-2 <= pos_out[t,0] <= py+2 and px-2 <= pos_out[t,1] <= px+2:
+                overlap = True
+        if overlap == True:
+            continue
+
+        y[my,mx,0] = 1.0
+        y[my,mx,1] = px % grid_size  # Object grid x index
+        y[my,mx,2] = py % grid_size  # Object grid y index
+        y[my,mx,3] = w # Object width
+        y[my,mx,4] = h # Object height
+        y[my,mx,5+class_] = 1.0
+
+        if class_ != 3:
+            X[py-h//2:py+(h-h//2),px-w//2:px+(w-w//2),0] = prfs[idx]*scales[k]
+        else:
+            X[py-h//2:py+(h-h//2),px-w//2:px+(w-w//2),0] = prfs[idx]
+        if class_ < 2:
+            pos_out[n,0] = py
+            pos_out[n,1] = px
+            n += 1
+    return n
+
+
+@njit(parallel=True,cache=True)
+def _build_batch(X,y,prfs,labels,idxs,cell_u,offxs,offys,scales,grid_size,pos_out,counts):
+    """Places sources into every image of the batch in parallel (images are independent)"""
+    for i in prange(X.shape[0]):
+        counts[i] = _place_sources(X[i],y[i],prfs,labels,idxs[i],cell_u[i],offxs[i],offys[i],scales[i],grid_size,pos_out[i])
+
+
+class PrfBuild:
+    """Create a training or test set of simulated TESS images containing both 'real' and 'false' sources"""
+
+    def __init__(self,Xtrain,ytrain,run=True):
+        """
+        Initialise
+        
+        Parameters
+        ----------
+        Xtrain : str
+            TESS prf arrays to be added into the training/test sets  
+        ytrain : str
+            TESS prf arrays to be added into the training/test sets (positive/negative sources can either share a label or have different labels)
+        
+        Options
+        -------
+        run : bool
+            if true (default) then the training/test set will be built upon calling PrfBuild rather 
+            than just defining the prfs and corresponding labels 
+        """
+        self.Xtrain = Xtrain
+        self.ytrain = ytrain
+        self.directory = os.path.dirname(os.path.abspath(__file__)) + '/'
+        #memory-map the prf files where possible; object-dtype files still need the pickle path
+        if type(self.Xtrain) == str:
+            try:
+                self.Xtrain = np.load(self.directory+'training_data.npy',mmap_mode='r')
+            except ValueError:
+                self.Xtrain = np.load(self.directory+'training_data.npy',allow_pickle=True)
+        if type(self.ytrain) == str:
+            try:
+                self.ytrain = np.load(self.directory+'training_labels.npy',mmap_mode='r')
+            except ValueError:
+                self.ytrain = np.load(self.directory+'training_labels.npy',allow_pickle=True)
+        #convert the (possibly object-dtype) prf stamps to a contiguous float32 stack so indexing in make_labels is a plain view;
+        #stamps whose shape disagrees with their labelled width/height can never be placed so they are dropped here
+        prfs = [np.asarray(prf,dtype=np.float32) for prf in self.Xtrain]
+        labels = np.asarray(list(self.ytrain),dtype=np.intp)
+        keep = [i for i in range(min(len(prfs),len(labels))) if prfs[i].shape == (labels[i][4],labels[i][3])]
+        self.Xtrain = np.ascontiguousarray(np.stack([prfs[i] for i in keep]))
+        self.ytrain = np.ascontiguousarray(labels[keep])
+        if run==True:
+            self.make_data()
+
+
+    def make_labels(self,X,y,idxs,cell_u,offxs,offys,scales):
+        """
+        Places true/false sources into the training/test array with randomly assigned positions and updates
+        the label arrays accordingly (this is called once per training/test image)
+
+        Parameters
+        ----------
+        X : array
+            training/test dataset template with background but no sources
+        y : array
+            training/test dataset labels template (np.zeros array)
+        idxs : array
+            pre-drawn prf indices for each of the (at most) num sources in this image
+        cell_u : array
+            pre-drawn uniforms used to pick a free grid cell for each source
+        offxs, offys : array
+            pre-drawn pixel offsets of each source within its grid cell
+        scales : array
+            pre-drawn brightness scales for each source
+
+        Returns
+        -------
+        positions : list
+            list of tuples corresponding to the coordinates of the true/false sources
+        """
+
+        pos_out = np.zeros((len(idxs),2),dtype=np.int64)
+        n = _place_sources(X,y,self.Xtrain,self.ytrain,idxs,cell_u,offxs,offys,scales,self.grid_size,pos_out)
+        return [(int(pos_out[t,0]),int(pos_out[t,1])) for t in range(n)]
+        
+
+    def make_data(self,x_shape=(16,16),y_shape=(4,4),size=64,num=2,dtype=np.float32):
+        """
+        Creates the template training/test dataset and label arrays and saves the positions of the real/false sources.
+
+        Parameters
+        ----------
+        x_shape : tuple (default (16,16))
+            shape of the training/test images
+        y_shape : tuple (default (4,4))
+            shape of the object position/size/label output
+        size : int (default 64)
+            number of training/test images
+        num : int (default 2)
+            maximum number of true/false sources in each image
+        dtype : numpy dtype (default np.float32)
+            dtype of the output images (e.g. np.float16 to halve the memory footprint for training); the labels stay float32
+
+        Outputs
+        -------
+        sources : list
+            positions (as tuples) of the sources in the image
+        X : array
+            training/test images
+        y : array
+            labels corresponding to the training/test images (labels for object position, size, likelihood, and probability of positive/negative/false source)
+        """
+        
+        self.x_shape = x_shape
+        self.y_shape = y_shape
+        self.grid_size = int(x_shape[0]/y_shape[0])
+
+        rng = np.random.default_rng()
+        sigmas = (rng.random(size,dtype=np.float32)*0.2+0.4).reshape(size,1,1,1)
+        #noise fully defines the background, so fill an uninitialised buffer in place rather than zeroing it first
+        X = np.empty((size, self.x_shape[0], self.x_shape[1], 1), dtype=np.float32)
+        rng.standard_normal(dtype=np.float32,out=X[...,0])
+        X *= sigmas
+        y = np.zeros((size, self.y_shape[0], self.y_shape[1], 9), dtype=np.float32)
+        positions = [None]*size
+
+        #draw the randoms for the whole batch in one shot rather than per image
+        idxs = rng.integers(0,len(self.Xtrain),(size,num))
+        cell_u = rng.random((size,num),dtype=np.float32)
+        offxs = rng.integers(0,self.grid_size,(size,num))
+        offys = rng.integers(0,self.grid_size,(size,num))
+        scales = rng.random((size,num),dtype=np.float32)*2.5+0.5
+
+        pos_out = np.zeros((size,num,2),dtype=np.int64)
+        counts = np.zeros(size,dtype=np.int64)
+        _build_batch(X,y,self.Xtrain,self.ytrain,idxs,cell_u,offxs,offys,scales,self.grid_size,pos_out,counts)
+        for i in range(size):
+            positions[i] = [(int(pos_out[i,t,0]),int(pos_out[i,t,1])) for t in range(counts[i])]
+            
+        self.sources = min(positions)
+        #images are built in float32 and only cast at the end (numba kernels are compiled for float32)
+        if dtype != np.float32:
+            X = X.astype(dtype)
+        self.X = X
+        self.y = y
+
+
+    def to_tf_dataset(self,batch_size=32,shuffle=True):
+        """
+        Wraps the generated images and labels in a tf.data.Dataset pipeline so a training loop can
+        consume them without re-copying the arrays each epoch (cached, batched, and prefetched)
+
+        Parameters
+        ----------
+        batch_size : int (default 32)
+            batch size used when training the ML model
+        shuffle : bool (default True)
+            if True then shuffle the dataset each epoch
+
+        Returns
+        -------
+        dataset : tf.data.Dataset
+            pipeline yielding (X,y) batches with prefetching enabled
+        """
+
+        import tensorflow as tf
+        dataset = tf.data.Dataset.from_tensor_slices((self.X,self.y)).cache()
+        if shuffle == True:
+            dataset = dataset.shuffle(len(self.X))
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
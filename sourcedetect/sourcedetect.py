@@ -1,945 +1,1107 @@
-import logging
-logging.getLogger("tensorflow").setLevel(logging.WARNING)
-logging.getLogger('tensorflow').disabled = True
-import os
-os.environ["TF_CPP_MIN_LOG_LEVEL"]="3"
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-import pandas as pd
-from scipy.ndimage import center_of_mass
-import keras
-import keras.ops as ops
-
-
-import tensorflow as tf
-tf.get_logger().setLevel('ERROR')
-#tf.autograph.set_verbosity(2)
-from photutils.aperture import CircularAperture as CA
-from copy import deepcopy
-
-
-from .prfbuild import PrfBuild
-from .prfmodel import PrfModel
-
-
-
-class SourceDetect:
-    """Performs object detection and analysis on a set of real TESS images"""
-
-    def __init__(self,flux,Xtrain='default',ytrain='default',savepath=None,savename=None,model='default',threshold=0.8,train=False,run=False,do_cut=False,
-                 precheck=False,batch_size=32,epochs=50,validation_split=0.1,optimizer=tf.keras.optimizers.Adam,learning_rate=0.003,
-                 metrics=["categorical_accuracy"],monitor='loss',verbose=0,save=False):
-        """
-        Initialise
-        
-        Parameters
-        ----------
-        flux : array or str
-            TESS image (array of fluxes): either the array itself or its filepath to its file; the flux array must be 2D with dimensions (y,x) or 3D with dimensions (n_frames,y,x)
-        Xtrain : str or array (default 'default')
-            TESS prf arrays (npy file) to be added into the training/test sets; if 'default' then load premade set  
-        ytrain : str or array (default 'default')
-            labels of the TESS prf arrays (npy file) to be added into the training/test sets; if 'default' then load premade labels (positive/negative sources can either share a label or have different labels)
-        savepath : str or None (default None)
-            location to save any output models, tables, and figures will be saved
-        savename : str or None (default None)
-            beginning of the savename for any tables or plots made 
-        model : str or keras.Model (default 'default')
-            ML model or model savepath; if 'default' then a prebuilt model is defined
-        threshold : float (defualt 0.8)
-            the minimum probability of genuine detection to append to the results tables
-        train : bool (default False)
-            if true then the ML model is trained on the Xtrain dataset (only use if calling an untrained custom model)
-        run : bool (default False)
-            if True then the entire source detection and analysis pipeline is run with default settings
-        do_cut : bool (default False)
-            if True then the TESS images are cut via a user prompt to specify the desired region to keep
-        precheck : bool (default False)
-            if True then display the first frame prior to object detection to check for any formatting issues 
-        batch_size : int (default 32)
-            batch size used when training the ML model 
-        epochs : int (default 50)
-            number of training epochs performed by the ML model 
-        validation_split : float (default 0.1)
-            the ratio of training set images used in the validation set
-        optimizer : tensorflow.keras.optimizers instance (default Adam)
-            tensorflow optimiser method to be used by the ML model
-        learning_rate : float (default 0.003)
-            learning rate during the training process
-        metrics : list (default ["categorical_accuracy"])
-            list of metrics (strings and/or keras.metrics.Metric instances) to be evaluated by the model during training/testing (using tensorflow naming conventions)
-        monitor : str (default 'loss')
-            name of metric to monitor during training (using tensorflow naming conventions)
-        """
-                     
-        if type(flux) == str:
-            flux = np.load(flux)
-        try:
-            type(flux) == np.ndarray
-        except:
-            raise TypeError('flux has to be either a numpy array or a string (filename/path of a numpy array)')
-        self.flux = flux
-        if savepath == None:
-            self.savepath = '.'
-        else:
-            self.savepath = savepath
-        if savename == None:
-            self.savename = '.'
-        else:
-            self.savename = savename
-        self.directory = os.path.dirname(os.path.abspath(__file__)) + '/'
-        if type(model) == str:
-            self.if_train = model
-            if model == 'default':
-                model = self.directory+'default_model.keras'
-            self.model = keras.saving.load_model(model,compile=False)
-        else:
-            self.model = model
-            self.if_train = self.model
-        self.precheck = precheck
-        self.train = train
-        self.save = save
-
-        self.batch_size = batch_size
-        self.epochs = epochs
-        self.validation_split = validation_split
-
-        self.optimizer = optimizer
-        self.learning_rate = learning_rate
-        self.monitor = monitor
-        self.metrics = metrics
-        self.issues = False
-        self.threshold = threshold
-        self.verbose = verbose
-
-        self.Xtrain = Xtrain
-        self.ytrain = ytrain
-        if type(Xtrain) == str:
-            if self.Xtrain == 'default':
-                # self.Xtrain = np.load(self.directory+'training_data.npy',allow_pickle=True)
-                pass
-            else:
-                self.Xtrain = np.load(self.Xtrain,allow_pickle=True)
-        if type(ytrain) == str:
-            if self.ytrain == 'default':
-                # self.ytrain = np.load(self.directory+'training_labels.npy',allow_pickle=True)
-                pass
-            else:
-                self.ytrain = np.load(self.ytrain,allow_pickle=True)
-        if len(self.flux.shape) == 2:
-            self.flux = np.expand_dims(self.flux,0)
-
-        if run == True:
-            self.SourceDetect(train=train,do_cut=do_cut)
-
-
-    def cut(self,xrange=None,yrange=None):
-        """
-        Cut the TESS images down to a specified subregion or via a user prompt 
-        
-        Parameters
-        ----------
-        xrange : None or tuple (default None)
-            upper and lower bound for the x-axis of the image cut; if None then this is defined by a user prompt
-        yrange : None or tuple (default None)
-            upper and lower bound for the y-axis of the image cut; if None then this is defined by a user prompt
-        """
-        
-        plt.figure()
-        if yrange == None or xrange == None:
-            ranges = input('Enter the bounds for the cut in the form "ymin,ymax,xmin,xmax": ').split(',')
-            yrange, xrange = [int(ranges[0]),int(ranges[1])], [int(ranges[2]),int(ranges[3])]
-
-        plt.imshow(self.flux[0,yrange[0]:yrange[1],xrange[0]:xrange[1]],vmin=-10,vmax=10)
-        plt.colorbar()
-        plt.show()
-
-        confirm = ':)'
-        while confirm.upper() not in ('YES',''):
-            confirm = input('Would you like to make the above cut? Type "yes" to confirm or leave blank to cancel: ')
-        if confirm == "yes":
-            self.flux = self.flux[:,yrange[0]:yrange[1],xrange[0]:xrange[1]]
-        
-
-    def apply_model(self,train=False):
-        """
-        Apply the desired model to perform object detection on the image. This funciton can also build, compile and train a ML model using find_sources.PrfModel if desired
-        
-        Parameters
-        ----------
-        train : bool (default False)
-            if True then build and train the model with find_sources.PrfModel
-        """
-        
-        if self.train == True or train == True:
-            _model = PrfModel(self.Xtrain,self.ytrain,savepath=self.savepath,model=self.if_train,loss_func='default')
-            self.model = _model.model
-            self.flux = np.expand_dims(self.flux,-1)
-     
-        #Prevents issue where model doesn't like datasets with shapes different to the training set:
-        _ = self.model.predict(np.ones((1,16,16,1)),verbose=self.verbose)
-        
-        if self.verbose > 0:
-            print('Applying model:')
-        if len(self.flux.shape) == 3:
-            self.flux = np.expand_dims(self.flux,-1)
-        self.y = self.model.predict(self.flux*np.ones(self.flux.shape),verbose=self.verbose)
-
-
-    def close_detect(self):
-        """
-        Identifies any groups of object detections that are in close proximity to one another (potential double detections or close sources)
-        
-        Outputs
-        -------
-        close_sources : list
-            positions (as tuples) of detections within close proximity to each other across all images
-        close_sources_by_frame : list
-            lists of positions (as tuples) of detections within close proximity to each other detected per image
-        """
-        
-        self.close_sources, self.close_sources_by_frame = [], []
-
-        for s in range(0,len(self.sources_by_frame)):
-            close_objs = [[] for _ in range(len(self.sources_by_frame[s]))]
-
-            for i in range(0,len(self.sources_by_frame[s])):
-                for j in range(0,len(self.sources_by_frame[s])):
-                    if i != j:
-                        if np.abs(self.sources_by_frame[s][i][0]-self.sources_by_frame[s][j][0]) <= 2 and np.abs(self.sources_by_frame[s][i][1]-self.sources_by_frame[s][j][1]) <= 2:
-                            close_objs[i].append(self.sources_by_frame[s][j])
-
-            _close_sources = []
-            for i in range(0,len(self.sources_by_frame[s])):
-                for j in range(0,len(close_objs)):
-                    if i != j:
-                        if self.sources_by_frame[s][i] in close_objs[j]:
-                            for k in range(0,len(close_objs[i])):
-                                if close_objs[i][k] not in close_objs[j]:   
-                                    close_objs[j].append(close_objs[i][k])
-
-            for i in range(0,len(close_objs)):
-                if len(close_objs[i]) > 0 and sorted(close_objs[i]) not in _close_sources:
-                    _close_sources.append(sorted(close_objs[i]))
-
-            for i in range(0,len(_close_sources)):
-                if len(_close_sources[i]) > 0:
-                    self.close_sources.append(_close_sources[i])
-
-            self.close_sources_by_frame.append(_close_sources)
-
-
-    def unique_detect(self):
-        """
-        Identifies all guaranteed unique detections in each TESS image (detections not in close proximity to any others plus one detection from each grouping from SourceDetect.close_detect) 
-        
-        Outputs
-        -------
-        unique_sources : list
-            list of positions (as tuples) of every guaranteed unique detection in each image
-        """
-        
-        try:
-            self.close_sources_by_frame = self.close_sources_by_frame
-        except:
-            self.close_detect()
-
-        self.unique_sources = []
-        for s in range(0,len(self.sources_by_frame)):
-            if len(self.close_sources_by_frame[s])>0:
-                _unique_sources = []
-
-                for i in range(0,len(self.sources_by_frame[s])):
-                    add = True
-
-                    for j in range(0,len(self.close_sources[s])):
-                        if self.sources_by_frame[s][i] in self.close_sources_by_frame[s][j][1:]:
-                            add = False
-
-                    if add == True:
-                        _unique_sources.append(self.sources_by_frame[s][i])
-
-                self.unique_sources.append(_unique_sources)
-
-            else:
-                self.unique_sources.append(self.sources_by_frame[s])
-
-
-    def detect(self,threshold=None,grid_size=4,close=True,unique=False):
-        """
-        Documents all potential sources detected by the ML model in each image, their potential variability and whether they are in close proximity to any other detections
-        
-        Parameters
-        ----------
-        threshold : float (default 0.8)
-            minimum probability of being a true source (according to the ML model) required for detections to be boxed in the plot
-        grid_size : int (default 4)
-            ratio between image size and mask size (pixel area of potential detection sites)
-        close : bool (default True)
-            if True then document all grouping of detections in each frame in close proximity to other detections (keep True if you want analysis tables to work)
-        unique : bool (default False)
-            if True then document all guaranteed unique detections (detections not in close proximity to any others plus one detection from each grouping from SourceDetect.close_detect)
-        
-        Outputs
-        -------
-        sources : list
-            positions (as tuples) of every source detected in every image
-        sources_by_frame : list
-            lists of positions (as tuples) of every source detected per image
-        to_plot : list
-            list of tuples that can be used to plot detection results
-        psflike : list
-            probability of each detection being a PSF source
-        num_sources : list
-            number of sources detected in each image
-        frames : list
-            the frame (image index) each detection is found in (list of equal length to sources)
-        sourceID : dictionary
-            pairs each unique detection (by position) to a unique ID number
-        flux_sign : list
-            indicates whether each detection has positive or negative flux
-        variable_flag : dictionary
-            documents whether each unique detection (by position) was flagged for variability
-        """
-        
-        if threshold is None:
-            threshold = self.threshold
-        self.sources, self.sources_by_frame = [], []
-        self.to_plot, self.psflike = [], []
-        self.num_sources, self.frames = [], []
-        self.flux_sign, self.variable_flag, variable_flag_counter =  [], {}, {}
-        if self.verbose > 0:
-            print('Performing object detection:')
-        for a in range(0,len(self.flux)):
-            i, j = self.y[a].shape[0], self.y[a].shape[1]
-            numb_sources = 0
-            positions = []
-            to_plot_ = []
-            for mx in range(j):
-                for my in range(i):
-                    channels = self.y[a][my][mx]
-                    prob, x1, y1, x2, y2, bright, dim, trash, fake = channels
-                    x1, y1 = round(x1), round(y1)
-
-                    #Ignore all detections with low probability and those likely to be 'trash' or 'fake' sources
-                    if prob < threshold:
-                        continue
-                    if fake > 0.8:
-                        continue
-                    if bright < 0.6 and dim < 0.6:
-                        if bright < 0.5 and dim < 0.5:
-                            continue
-                        elif fake > 0.2:
-                            continue
-                    if trash > bright and trash > dim:
-                        continue
-                    if fake > bright and fake > dim:
-                        #For 'close calls' which are usually genuine detections
-                        if fake - bright > 0.2 or fake - dim > 0.2:
-                            continue
-                    if abs(x2) > 6 or abs(y2) > 6:
-                        continue
-
-                    # px, py = (mx * grid_size) + x1, (my * grid_size) + y1
-                    px, py = mx*grid_size + x1%grid_size, my*grid_size + y1%grid_size
-                    while int(py) < 2:
-                        py += 2
-                    while int(px) < 2:
-                        px += 2
-                    while int(py) > self.flux.shape[1]-3:
-                        py -= 2
-                    while int(px) > self.flux.shape[2]-3:
-                        px -= 2
-
-                    #Final filters for any obvious false detections on background fluctuations or overexposures
-                    if self.flux[a][int(py),int(px)] > -1.5 and self.flux[a][int(py),int(px)] < 1.5:
-                        continue 
-                    if np.max(self.flux[a][int(py)-2:int(py)+3,int(px)-2:int(px)+3]) > 5 and np.min(self.flux[a][int(py)-2:int(py)+3,int(px)-2:int(px)+3]) < -5:
-                        continue
-                    
-                    numb_sources += 1
-                    sizes = [2,1]
-                    for size in sizes:
-                        intpy = int(py + 0.5); intpx = int(px + 0.5)
-                        cut = abs(deepcopy(self.flux[a,intpy-size:intpy+size+1,intpx-size:intpx+size+1]))
-                        if np.nansum(cut) > 0.95:
-                            cm = center_of_mass(cut)
-                            py = py+(cm[0]-size);px = px+(cm[1]-size)
-                    #smax = np.where(np.abs(self.flux[a][int(py)-1:int(py)+2,int(px)-1:int(px)+2,0])==np.max(np.abs(self.flux[a][int(py)-1:int(py)+2,int(px)-1:int(px)+2,0])))
-                    #print(smax)
-                    # smax = np.where(np.abs(self.flux[a][int(py-y2/2):int(py+y2/2+1),int(px-x2/2):int(px+x2/2+1),0])==np.max(np.abs(self.flux[a][int(py-y2/2):int(py+y2/2+1),int(px-x2/2):int(px+x2/2+1),0])))
-                    # smax_i = (int(py)+smax[0][0]-1,int(px)+smax[1][0]-1)
-                    smax_i = (py,px)
-                    try:
-                        if (smax_i not in positions) & np.isfinite(py) & np.isfinite(px):
-                            to_plot_.append((prob,smax_i[1],smax_i[0],x2,y2))
-                            positions.append(smax_i)
-                            self.sources.append(smax_i)
-                            self.psflike.append(prob)
-                            self.frames.append(a)
-
-                            if smax_i not in self.variable_flag:
-                                self.variable_flag[smax_i] = 1*(bright>dim)
-                                variable_flag_counter[smax_i] = 0
-                            else:
-                                if self.variable_flag[smax_i] != 1*(bright>dim):
-                                    variable_flag_counter += 1
-                                    self.variable_flag[smax_i] = 1*(bright>dim)
-
-                            if self.flux[a][int(smax_i[0]),int(smax_i[1])] > 0:
-                                self.flux_sign.append(1)
-                            else:
-                                self.flux_sign.append(-1)
-                    except:
-                        pass
-            self.to_plot.append(to_plot_)
-            self.sources_by_frame.append(sorted(positions))
-            self.num_sources.append(numb_sources)
-
-        for i in self.variable_flag.keys():
-            if variable_flag_counter[i] >= 5:
-                self.variable_flag[i] = True
-            else:
-                self.variable_flag[i] = 'unsure'
-
-        self.sourceID = {}
-        id = 0
-        for s in self.sources:
-            if s not in self.sourceID:
-                self.sourceID[s] = id
-                id += 1
-
-        if close == True:
-            self.close_detect()
-        if unique == True:
-            self.unique_detect()
-        if self.verbose > 0:
-            print('Object detection complete')
-
-
-    def get_flux(self,analyse=False,position=None,frame=None):
-        """
-        Creates a list of the fluxes of each potential source detected by the model or provides the flux at a specified position
-        
-        Parameters
-        ----------
-        analyse : bool (default False)
-            if True then document flux or every detection in every image
-        position : None or tuple (default None)
-            if analyse is False then this specifies the position of the detection
-        frame : None or int (default None)
-            if analyse if False then this specifies the frame (image index) with the detection
-        
-        Outputs
-        -------
-        source_flux : list
-            flux of every detection in every image (only output if analyse is True)
-        """
-        
-        if analyse == True:
-            self.source_flux = []
-            for s in range(0,len(self.sources)):
-                # ind = np.where(np.array(self.to_plot[self.frames[s]])[1:3] == [self.sources[s][1],self.sources[s][0]])[0]
-                # aper = RA(positions=(self.sources[s]),w=int(self.to_plot[self.frames[s]][ind][3]+1),h=int(self.to_plot[self.frames[s]][ind][4]+1))
-                # self.source_flux.append(aper.do_photometry(self.flux[self.frames[s]][:,:,0])[0][0])
-                x = int(self.sources[s][1] + 0.5); y = int(self.sources[s][0] + 0.5)
-                self.source_flux.append(np.sum(self.flux[int(self.frames[s])][y-1:y+2,x-1:x+2]))
-
-        else:
-            try:
-                print(f'Flux at position {position} in frame{frame}: {self.flux[frame,position[0],position[1]]}')
-            except:
-                print('Please specify the position and frame of the object when calling this method')
-
-
-    def group_and_id(self):
-        """
-        Identify the full groups of detections in close proximity across all images, assign each group a number, 
-        and document the number of detecitons at each (x,y) position across all images
-        
-        Outputs
-        -------
-        groups : list
-            lists of positions (as tuples) of detections in close proximity to each other across all frames 
-        groupID : dictionary
-            mapping between each potential detection and a group ID number (ID of -1 for detections not in a group)
-        n_detections : dictionary
-            mapping between the position of each potential detected source and the number of detections across all images    
-        """
-        
-        def find(parent, x):
-            """
-            Subprocess of SourceDetect.group_and_id.group
-            """
-            if parent[x] != x:
-                parent[x] = find(parent, parent[x])
-            return parent[x]
-
-        def union(parent, rank, x, y):
-            """
-            Subprocess of SourceDetect.group_and_id.group
-            """
-            rootX = find(parent, x)
-            rootY = find(parent, y)
-            if rootX != rootY:
-                if rank[rootX] > rank[rootY]:
-                    parent[rootY] = rootX
-                elif rank[rootX] < rank[rootY]:
-                    parent[rootX] = rootY
-                else:
-                    parent[rootY] = rootX
-                    rank[rootX] += 1
-
-        def group(close_sources):
-            """
-            Similar to SourceDetect.close_detect but across all images to obtain complete groupings of potential sources
-            
-            Parameters
-            ----------
-            close_sources : list
-                lists of positions (as tuples) of detections in close proximity to each other in each frame separately
-            
-            Returns
-            -------
-            result : list
-                lists of positions (as tuples) of detections in close proximity to each other across all frames 
-            """
-            
-            parent = {}
-            rank = {}
-
-            for sublist in close_sources:
-
-                for coord in sublist:
-                    if coord not in parent:
-                        parent[coord] = coord
-                        rank[coord] = 0
-
-                for i in range(len(sublist) - 1):
-                    union(parent, rank, sublist[i], sublist[i+1])
-
-            grouped = {}
-            for sublist in close_sources:
-                root = find(parent, sublist[0])
-
-                if root not in grouped:
-                    grouped[root] = set()
-                grouped[root].update(sublist)
-
-            result = [list(group) for group in grouped.values()]
-            return result
-        
-        def IDassign(groups,positions):
-            """
-            Assign a group (close proximity detections) ID number, or lack thereof, to every detections across all images
-            
-            Parameters
-            ----------
-            groups : list
-                list of lists containing positions of detections in close proximity to each other across all images
-            positions : list 
-                positions (as tuples) of every detection across all images
-            
-            Returns
-            -------
-            result_dict : dictionary
-                mapping between each potential detection and a group ID number (ID of -1 for detections not in a group)
-            """
-            id_map = {tuple(sorted(group)): idx for idx, group in enumerate(groups)}
-            position_to_id = {}
-
-            for group, group_id in id_map.items():
-                for coord in group:
-                    position_to_id[coord] = group_id
-
-            result_dict = {}
-            for coord in positions:
-                result_dict[coord] = position_to_id.get(coord, -1)
-
-            return result_dict
-
-        def get_num_detections(detections):
-            """
-            Determines the number of detections for potential sources across each image
-            
-            Parameters
-            ----------
-            detections : list 
-                positions (as tuples) of every detection across all images
-            
-            Returns
-            -------
-            n_detections : dictionary
-                mapping between the position of each potential detected source and the number of detections across all images    
-            """
-            
-            n_detections = {}
-            for i in detections:
-                if i in n_detections:
-                    n_detections[i] += 1
-                else:
-                    n_detections[i] = 1
-            return n_detections
-
-        self.groups = group(self.close_sources)
-        self.groupID = IDassign(self.groups,self.sources)
-        self.n_detections = get_num_detections(self.sources)
-
-
-    def preview(self,frame=0,do_cut=False):
-        """
-        Plots a specified image prior to object detection; can also apply a cut to the images via SourceDetect.cut
-        
-        Parameters
-        ----------
-        frame : int (default 0)
-            frame (image index) to be plotted 
-        do_cut : bool (default False)
-            if True then provide user prompt to apply a cut to the images via SourceDetect.cut 
-        
-        Outputs
-        -------
-        issues : bool
-            if True then there are user identifies issues with the flux file and the object detection process will be cancled
-        """
-        
-        plt.figure()
-        plt.imshow(self.flux[frame],vmin=-10,vmax=10)
-        plt.show()
-        issues = ''
-        while issues.lower() not in ['yes','no']:
-            input('Are there any issues with the image below (reply "yes" or "no"): ')
-        if issues.lower() == 'yes':
-            self.issues = True
-        if do_cut == True:
-            cut = input('Would you like to make a cut to the images (type "yes" to cut): ')
-            if cut.lower() == 'yes':
-                self.cut()
-
-
-    def resultdf(self,update=False,save=False):
-        """
-        Creates output tables summarising the full object detection process
-        
-        Parameters
-        ----------
-        update : bool (default False)
-            if True then update the events table rather than redefining both (only used from with in SourceDetect.combine_groups)
-        
-        Outputs
-        -------
-        result : pd.Dataframe
-            summary table of detections across all images
-        events : pd.Dataframe
-            summary table of potential sources (detections unique to each position) across all images
-        """
-        
-        if len(self.sources) > 0:
-            if update == False:
-                if self.verbose > 0:
-                    print('Collecting results:')
-                self.result = pd.DataFrame(data={'xcentroid':np.array(self.sources)[:,1],'ycentroid': np.array(self.sources)[:,0],'flux': self.source_flux,'frame':self.frames})
-                self.result['n_detections'] = self.result.apply(lambda row:self.n_detections[(row['ycentroid'],row['xcentroid'])],axis=1) 
-                self.result['objid'] = self.result.apply(lambda row:self.sourceID[(row['ycentroid'],row['xcentroid'])],axis=1)
-                self.result['group'] = self.result.apply(lambda row:self.groupID[(row['ycentroid'],row['xcentroid'])],axis=1)
-                self.result['flux_sign'] = self.flux_sign
-                self.result['psflike'] = self.psflike
-                self.result['xint'] = np.round(np.array(self.sources)[:,1].astype('float')).astype('int')
-                self.result['yint'] = np.round(np.array(self.sources)[:,0].astype('float')).astype('int')
-                self.result.drop(self.result[(self.result.flux>0) & (self.result.flux_sign=='negative')].index)
-                self.result.drop(self.result[(self.result.flux<0) & (self.result.flux_sign=='positive')].index)
-
-            self.events = self.result.drop_duplicates(subset='objid').drop(columns=['flux','frame','flux_sign']).reset_index()
-            self.result['abs_target'] = self.result['flux'].abs()
-            self.events['variability'] = self.events.apply(lambda row:self.variable_flag[(row['ycentroid'],row['xcentroid'])],axis=1)
-
-            max_flux = self.result.groupby('objid')['abs_target'].idxmax().to_dict()
-            self.result = self.result.drop(columns=['abs_target'])
-            self.events['max_flux'] = self.events.apply(lambda row:max_flux[row['objid']],axis=1)
-
-            framei,framef = self.result.groupby('objid')['frame'].min().to_dict(),self.result.groupby('objid')['frame'].max().to_dict()
-            self.events['start_frame'] = self.events.apply(lambda row:framei[row['objid']],axis=1)
-            self.events['end_frame'] = self.events.apply(lambda row:framef[row['objid']],axis=1)
-            self.events = self.events.drop(columns=['index'])
-            if self.save:
-                self.result.to_csv(f'{self.savepath}/{self.savename}/detected_sources')
-                self.events.to_csv(f'{self.savepath}/{self.savename}/detected_events')
-
-
-    
-    def combine_groups(self):
-        """
-        Reduce the result and events tables from SourceDetect.resultdf to only include the detection/source from each group with the largest flux 
-        (shows the minimum unique detections across all images)
-        
-        Outputs
-        -------
-        result : pd.Dataframe
-            summary table containing positions, flux, object ID, etc of all guaranteed unique detections across all images
-        events : pd.Dataframe
-            summary table containing positions, flux, frame duration, etc of all guaranteed unique potential sources (detections unique to each position) across all images
-        """
-        
-        self.result['abs_target'] = self.result['flux'].abs()
-        mask = self.result['group'].isin([-1])
-        excluded = self.result[mask]
-        included = self.result[~mask]
-
-        idx = included.groupby(['group','frame'])['abs_target'].idxmax()
-        filtered = self.result.loc[idx]
-        df_result = pd.concat([filtered, excluded])
-        df_result = df_result.drop(columns=['group','abs_target'])
-
-        self.result = df_result.reset_index(drop=True)
-
-        to_plot = []
-        for i in range(0,np.max(self.frames)+1):
-            to_plot_ = []
-            for c in range(0,len(self.to_plot[i])):
-                if self.to_plot[i][c][1:3] in self.result[['xcentroid','ycentroid']].values:
-                    to_plot_.append(self.to_plot[i][c])
-            to_plot.append(to_plot_)
-        self.to_plot = to_plot 
-
-        self.resultdf(update=True)
-
-
-    def analyse(self,train=False,threshold=0.8):
-        """
-        Build, compile and train a ML model then perform full object detection analysis and tablate the results
-        
-        Parameters
-        ----------
-        train : bool (default False)
-            if true then the ML model is trained on the Xtrain dataset (only use if calling an untrained custom model)
-        threshold : float (default 0.8)
-            minimum probability of being a true source (according to the ML model) required for detections to be boxed in the plot
-        """
-        
-        self.apply_model(train=train)
-        self.detect(threshold=threshold)
-        self.get_flux(analyse=True)
-        self.group_and_id()
-        self.resultdf()
-        self.combine_groups()
-
-
-    def check_region(self,xrange,yrange,frame=0):
-        """
-        Establishes a subregion of the images to be zoomed in on when plotting with SourceDetect.plot
-        
-        Parameters
-        ----------
-        xrange : tuple
-            lower and upper x-axis limits for the zoomed region desired for plotting 
-        yrange : tuple
-            lower and upper y-axis limits for the zoomed region desired for plotting 
-        frame : int (default 0)
-            desired frame (image index) to be plotted in the specified zoomed region
-        
-        Outputs
-        -------
-        zoom : list
-            positions (as tuples) of detections within the specified frame and zoomed region
-        zoom_range : list
-            bounds of the zoomed region: of the form [ymin,ymax,xmin,xmax]
-        """
-        
-        self.zoom = []
-        self.zoom_range = [yrange[0],yrange[1],xrange[1],xrange[0]]
-        for i in range(0,len(self.sources_by_frame[frame])):
-            if self.sources_by_frame[frame][i][0] in range(yrange[0],yrange[1]) and self.close_sources[frame][i][1] in range(xrange[0],xrange[1]):
-                self.zoom.append(self.sources_by_frame[frame][i])
-
-
-    def plot(self,which_plots=['sources'],frame=0,compare=False,zoom=False,saveplots=False,savepath=None,savename=None):
-        """
-        Produces output plots illustrating the object detection process with identification boxes.
-        Zoom currently only available for the close and unique sources plots
-        
-        Parameters
-        ----------
-        which_plots : list (default ['sources'])
-            one or more types of image plots to be produced out of the following options for identifying detections:
-                - "sources" : all detections within a particular frame 
-                - "close" : all detections in close proximity to other detections within a particular frame 
-                - "unique" : all guaranteed unique detections (only one from each grouping included) within a particular frame  
-                - "nobox" : the specified frame without any object detection boxes plotted on top
-        frame : int (default 0)
-            the frame (image index) to be plotted with speficied detections identified (see which_plots above)
-        compare : bool (default False)
-            if True then the plots specified by 'which_plots' will be displayed using matplotlib.pyplot.subplots rather than individually
-        zoom : bool (default False)
-            if True then only plot the region specified when calling SourceDetect.check_region (this must be done first)    
-        saveplots : bool (default False)
-            if True then save all plots to the location defined by SourceDetect.savepath
-        savepath : str or None (default None)
-            location to save any output models, tables, and figures will be saved (if None then the preexisting savepath is used)
-        savename : str or None (default None)
-            beginning of the savename for any plots made (if None then the preexisting savename is used)
-        """
-        
-        if zoom == True:
-            try:
-                self.zoom = self.zoom
-            except:
-                print('self.zoom, the region to be plotted, needs to be defined first by calling SourceDetect.check_region')
-        
-        if savepath != None:
-            self.savepath = savepath
-        if savename != None:
-            self.savename = savename
-                
-
-        def get_color_by_probability(p):
-            """
-            Specifies the box colour plotted for each source detection based on the confidence of the model.
-            This is only important when the threshold is lowered to display uncertain objects in the plots
-            
-            Parameters
-            ----------
-            p : float
-                the probability of a detection being a real source
-            
-            Returns
-            -------
-            colour : str
-                colour of the box to be plotted over the detected source (red, yellow, orange, or green)
-            """
-            
-            if p < 0.3:
-                return 'red'
-            if p < 0.8:
-                return 'yellow'
-            return 'green'
-        
-        
-        def plotter(ax,p,zoom=False):
-            """
-            Performs the plotting for SourceDetect.plot
-            
-            Parameters
-            ----------
-            ax : matplotlib.axes._axes.Axes
-                the subplot to be plotted on for this iteration
-            p : str
-                ones of the arguments from 'which_plots' defined when calling SourceDetect.plot
-            zoom : bool (default False)
-                if True then only plot the region specified when calling SourceDetect.zoom (this must be done first)            
-            """
-            
-            if p == 'sources':
-                ax.set_title('Detected Sources')
-
-                for prob, px, py, x2, y2 in self.to_plot[frame]:
-                    color = get_color_by_probability(prob)
-                    ax.add_patch(Rectangle((int(px-x2/2),int(py-y2/2)),int(x2+2),int(y2+2),edgecolor=color,fill=False,lw=1))
-
-                if zoom == True:
-                    ax.set_ylim(self.zoom_range[0],self.zoom_range[1])
-                    ax.set_xlim(self.zoom_range[2],self.zoom_range[3])
-
-                plt.show()
-
-            elif p == 'close':
-                ax.set_title('Close Proximity Detections')
-
-                for i in range(0,len(self.close_sources)):
-                    for j in range(0,len(self.close_sources[i])):
-                        ax.add_patch(Rectangle((int(self.close_sources[i][j][1]-2), int(self.close_sources[i][j][0]-2)), 4, 4, edgecolor='green', fill=False, lw=1))
-                
-                if zoom == True:
-                    ax.set_ylim(self.zoom_range[0],self.zoom_range[1])
-                    ax.set_xlim(self.zoom_range[2],self.zoom_range[3])
-                
-                plt.show()
-
-            elif p == 'unique':
-                ax.set_title('Definite Unique Detections')
-
-                for i, j in self.unique_sources[frame]:
-                    ax.add_patch(Rectangle((int(j-2),int(i-2)),4,4,edgecolor='green', fill=False, lw=1))
-                
-                if zoom == True:
-                    ax.set_ylim(self.zoom_range[0],self.zoom_range[1])
-                    ax.set_xlim(self.zoom_range[2],self.zoom_range[3])
-                                    
-                plt.show()
-
-            elif p == 'nobox':
-                ax.set_title('Original Frame')
-                plt.show()
-
-            else:
-                print('Invalid plot type (options are "sources", "close", "unique", "nobox", or a combination of these as a list or tuple)')
-    
-
-        if compare == False:
-            plotnames = {'sources':'detected_sources','close':'close_objects','unique':'unique_objects','nobox':'original_frame'}
-            for p in which_plots:
-                fig, ax = plt.subplots()
-                im = ax.imshow(self.flux[frame],vmin=-10,vmax=10)
-                fig.colorbar(im)
-                plotter(ax,p,zoom)
-                if saveplots == True:
-                    if zoom == True:
-                        plt.savefig(f'{self.savepath}/{self.savename}_{plotnames[p]}_zoomed', dpi=750)
-                    else:
-                        plt.savefig(f'{self.savepath}/{self.savename}_{plotnames[p]}', dpi=750)
-
-        else:
-            fig, ax = plt.subplots(1,len(which_plots),figsize=(10,10))
-            for p in range(0,len(which_plots)):
-                im = ax[p].imshow(self.flux[frame],vmin=-10,vmax=10)
-                plotter(ax[p],which_plots[p],zoom)
-            cbar_ax = fig.add_axes([0.93, 0.3, 0.022, 0.38])
-            fig.colorbar(im, cax=cbar_ax)
-            if saveplots == True:
-                if zoom == True:
-                    plt.savefig(f'{self.savepath}/{self.savename}_object_detection_zoomed', dpi=750)
-                else:
-                    plt.savefig(f'{self.savepath}/{self.savename}_object_detection', dpi=750)
-
-
-    def SourceDetect(self,flux=None,savepath=None,savename=None,train=None,do_cut=False,plot=False):
-        """
-        Perform object detection on a collection of TESS images/frames
-        
-        Parameters
-        ----------
-        flux : array or None (defualt None)
-            use this parameter to change the set of images being analysed rather than having to create a brand new SourceDetect object
-        savepath : str or None (default None)
-            location to save any output models, tables, and figures will be saved (if None then the preexisting savepath is used)
-        savename : str or None (default None)
-            beginning of the savename for any tables or plots made (if None then the preexisting savename is used)
-        train : bool (default False)
-            if true then the ML model is trained on the Xtrain dataset (only use if calling an untrained custom model)
-        do_cut : bool (default False)
-            if True then the TESS images are cut via a user prompt to specify the desired region to keep
-        plot : bool (default False)
-            if True then plot and save an example object detection plot on the first image/frame
-        """
-        
-        self.issues = False
-        if self.precheck == True:
-            self.preview(do_cut=do_cut)
-        if savepath !=None:
-            self.savepath = savepath
-        if savename != None:    
-            self.savename = savename
-        if type(train) == type(None):
-            train = self.train
-        else:
-            self.train = train
-        if self.issues == False:
-            if type(flux) != type(None):
-                self.flux = flux
-                if len(self.flux.shape) == 2:
-                    self.flux = np.expand_dims(self.flux,0)
-            self.analyse(train=train,threshold=self.threshold)
-        if self.verbose > 0:
-            print('Collection complete')
-        if plot == True:
-            self.plot(which_plots=['sources'],savepath=savepath,savename=savename)
+import logging
+from collections import defaultdict
+from itertools import count
+logging.getLogger("tensorflow").setLevel(logging.WARNING)
+logging.getLogger('tensorflow').disabled = True
+import os
+os.environ["TF_CPP_MIN_LOG_LEVEL"]="3"
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Rectangle
+from matplotlib.collections import PatchCollection
+import pandas as pd
+from scipy.ndimage import center_of_mass
+from scipy.spatial import cKDTree
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+import keras
+import keras.ops as ops
+
+
+import tensorflow as tf
+tf.get_logger().setLevel('ERROR')
+#tf.autograph.set_verbosity(2)
+from photutils.aperture import CircularAperture as CA
+from copy import deepcopy
+
+
+from .prfbuild import PrfBuild, njit
+from .prfmodel import PrfModel
+
+
+@njit(cache=True)
+def _flux_window_filter(flux_img,iys,ixs):
+    """
+    Evaluates the per-candidate flux-window filters from SourceDetect.detect (centre pixel inside the
+    background band, or a 5x5 neighbourhood containing both a strong positive and a strong negative
+    excursion) as one compiled loop over the clamped candidate coordinates; returns a boolean mask
+    of the candidates that survive
+    """
+    good = np.ones(len(iys),dtype=np.bool_)
+    for k in range(len(iys)):
+        iy, ix = iys[k], ixs[k]
+        centre = flux_img[iy,ix]
+        if centre > -1.5 and centre < 1.5:
+            good[k] = False
+            continue
+        mx5, mn5 = flux_img[iy-2,ix-2], flux_img[iy-2,ix-2]
+        for dy in range(-2,3):
+            for dx in range(-2,3):
+                v = flux_img[iy+dy,ix+dx]
+                #the inverted comparisons keep NaNs sticky, matching np.max/np.min propagation
+                if not (v <= mx5):
+                    mx5 = v
+                if not (v >= mn5):
+                    mn5 = v
+        if mx5 > 5 and mn5 < -5:
+            good[k] = False
+    return good
+
+
+class SourceDetect:
+    """Performs object detection and analysis on a set of real TESS images"""
+
+    def __init__(self,flux,Xtrain='default',ytrain='default',savepath=None,savename=None,model='default',threshold=0.8,train=False,run=False,do_cut=False,
+                 precheck=False,batch_size=32,epochs=50,validation_split=0.1,optimizer=tf.keras.optimizers.Adam,learning_rate=0.003,
+                 metrics=["categorical_accuracy"],monitor='loss',verbose=0,save=False,mixed_precision=False):
+        """
+        Initialise
+        
+        Parameters
+        ----------
+        flux : array or str
+            TESS image (array of fluxes): either the array itself or its filepath to its file; the flux array must be 2D with dimensions (y,x) or 3D with dimensions (n_frames,y,x)
+        Xtrain : str or array (default 'default')
+            TESS prf arrays (npy file) to be added into the training/test sets; if 'default' then load premade set  
+        ytrain : str or array (default 'default')
+            labels of the TESS prf arrays (npy file) to be added into the training/test sets; if 'default' then load premade labels (positive/negative sources can either share a label or have different labels)
+        savepath : str or None (default None)
+            location to save any output models, tables, and figures will be saved
+        savename : str or None (default None)
+            beginning of the savename for any tables or plots made 
+        model : str or keras.Model (default 'default')
+            ML model or model savepath; if 'default' then a prebuilt model is defined
+        threshold : float (defualt 0.8)
+            the minimum probability of genuine detection to append to the results tables
+        train : bool (default False)
+            if true then the ML model is trained on the Xtrain dataset (only use if calling an untrained custom model)
+        run : bool (default False)
+            if True then the entire source detection and analysis pipeline is run with default settings
+        do_cut : bool (default False)
+            if True then the TESS images are cut via a user prompt to specify the desired region to keep
+        precheck : bool (default False)
+            if True then display the first frame prior to object detection to check for any formatting issues 
+        batch_size : int (default 32)
+            batch size used when training the ML model 
+        epochs : int (default 50)
+            number of training epochs performed by the ML model 
+        validation_split : float (default 0.1)
+            the ratio of training set images used in the validation set
+        optimizer : tensorflow.keras.optimizers instance (default Adam)
+            tensorflow optimiser method to be used by the ML model
+        learning_rate : float (default 0.003)
+            learning rate during the training process
+        metrics : list (default ["categorical_accuracy"])
+            list of metrics (strings and/or keras.metrics.Metric instances) to be evaluated by the model during training/testing (using tensorflow naming conventions)
+        monitor : str (default 'loss')
+            name of metric to monitor during training (using tensorflow naming conventions)
+        mixed_precision : bool (default False)
+            if True then run the model with a keras mixed-precision policy ('mixed_float16' on GPU,
+            'mixed_bfloat16' otherwise) to halve the activation memory traffic during inference
+        """
+                     
+        if type(flux) == str:
+            flux = np.load(flux)
+        try:
+            type(flux) == np.ndarray
+        except:
+            raise TypeError('flux has to be either a numpy array or a string (filename/path of a numpy array)')
+        self.flux = flux
+        if savepath == None:
+            self.savepath = '.'
+        else:
+            self.savepath = savepath
+        if savename == None:
+            self.savename = '.'
+        else:
+            self.savename = savename
+        self.directory = os.path.dirname(os.path.abspath(__file__)) + '/'
+        #a global policy only affects layers built after it is set, and keras restores each layer's
+        #serialised float32 policy when loading a saved model, so the policy is also applied per
+        #layer once the model exists (see SourceDetect._set_mixed_policy)
+        if mixed_precision == True:
+            if len(tf.config.list_physical_devices('GPU')) > 0:
+                self._mixed_policy = 'mixed_float16'
+            else:
+                self._mixed_policy = 'mixed_bfloat16'
+            keras.mixed_precision.set_global_policy(self._mixed_policy)
+        else:
+            self._mixed_policy = None
+        if type(model) == str:
+            self.if_train = model
+            if model == 'default':
+                model = self.directory+'default_model.keras'
+            self.model = keras.saving.load_model(model,compile=False)
+        else:
+            self.model = model
+            self.if_train = self.model
+        if self._mixed_policy is not None:
+            self._set_mixed_policy()
+        self.precheck = precheck
+        self.train = train
+        self.save = save
+
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.validation_split = validation_split
+
+        self.optimizer = optimizer
+        self.learning_rate = learning_rate
+        self.monitor = monitor
+        self.metrics = metrics
+        self.issues = False
+        self.threshold = threshold
+        self.verbose = verbose
+
+        self.Xtrain = Xtrain
+        self.ytrain = ytrain
+        if type(Xtrain) == str:
+            if self.Xtrain == 'default':
+                # self.Xtrain = np.load(self.directory+'training_data.npy',allow_pickle=True)
+                pass
+            else:
+                self.Xtrain = np.load(self.Xtrain,allow_pickle=True)
+        if type(ytrain) == str:
+            if self.ytrain == 'default':
+                # self.ytrain = np.load(self.directory+'training_labels.npy',allow_pickle=True)
+                pass
+            else:
+                self.ytrain = np.load(self.ytrain,allow_pickle=True)
+        if len(self.flux.shape) == 2:
+            self.flux = np.expand_dims(self.flux,0)
+
+        if run == True:
+            self.SourceDetect(train=train,do_cut=do_cut)
+
+
+    def cut(self,xrange=None,yrange=None):
+        """
+        Cut the TESS images down to a specified subregion or via a user prompt 
+        
+        Parameters
+        ----------
+        xrange : None or tuple (default None)
+            upper and lower bound for the x-axis of the image cut; if None then this is defined by a user prompt
+        yrange : None or tuple (default None)
+            upper and lower bound for the y-axis of the image cut; if None then this is defined by a user prompt
+        """
+        
+        plt.figure()
+        if yrange == None or xrange == None:
+            ranges = input('Enter the bounds for the cut in the form "ymin,ymax,xmin,xmax": ').split(',')
+            yrange, xrange = [int(ranges[0]),int(ranges[1])], [int(ranges[2]),int(ranges[3])]
+
+        plt.imshow(self.flux[0,yrange[0]:yrange[1],xrange[0]:xrange[1]],vmin=-10,vmax=10)
+        plt.colorbar()
+        plt.show()
+
+        confirm = ':)'
+        while confirm.upper() not in ('YES',''):
+            confirm = input('Would you like to make the above cut? Type "yes" to confirm or leave blank to cancel: ')
+        if confirm == "yes":
+            self.flux = self.flux[:,yrange[0]:yrange[1],xrange[0]:xrange[1]]
+        
+
+    def _set_mixed_policy(self):
+        """
+        Applies the mixed-precision policy to the hidden layers of the model. keras restores each
+        layer's serialised dtype policy when deserialising a saved model, so setting the global
+        policy alone leaves a loaded model at float32. The output heads (the final convolutions)
+        and everything downstream of them are pinned to float32 so the detection grid used for
+        thresholding in SourceDetect.detect keeps full precision
+        """
+
+        fp32, stack = set(), list(self.model.outputs)
+        while len(stack) > 0:
+            op = stack.pop()._keras_history[0]
+            if op not in fp32:
+                fp32.add(op)
+                #stop the backwards walk at the first weighted layers (the head convolutions);
+                #raw keras.ops operations carry no weights and just follow their input dtypes
+                if len(getattr(op,'weights',[])) == 0:
+                    ins = op.input if isinstance(op.input,(list,tuple)) else [op.input]
+                    stack.extend(ins)
+        for layer in self.model.layers:
+            if layer in fp32:
+                layer.dtype_policy = 'float32'
+            else:
+                layer.dtype_policy = self._mixed_policy
+
+
+    def apply_model(self,train=False,xla=False):
+        """
+        Apply the desired model to perform object detection on the image. This funciton can also build, compile and train a ML model using find_sources.PrfModel if desired
+
+        Parameters
+        ----------
+        train : bool (default False)
+            if True then build and train the model with find_sources.PrfModel
+        xla : bool (default False)
+            if True then compile the inference graph with XLA so the network is fused into fewer
+            kernels; the first call on each batch shape pays a one-off compilation cost
+        """
+        
+        if self.train == True or train == True:
+            _model = PrfModel(self.Xtrain,self.ytrain,savepath=self.savepath,model=self.if_train,loss_func='default')
+            self.model = _model.model
+            if self._mixed_policy is not None:
+                self._set_mixed_policy()
+            self.flux = np.expand_dims(self.flux,-1)
+
+        #use the quantized interpreter instead when one has been built with SourceDetect.quantize_model
+        if getattr(self,'interpreter',None) is not None:
+            if len(self.flux.shape) == 3:
+                self.flux = np.expand_dims(self.flux,-1)
+            x = np.asarray(self.flux,dtype=np.float32)
+            probe = self._infer_tflite(x[:1])
+            self.y = np.empty((len(x),)+probe.shape[1:],dtype=np.float32)
+            for b in range(0,len(x),self.batch_size):
+                self.y[b:b+self.batch_size] = self._infer_tflite(x[b:b+self.batch_size])
+            return
+
+        #Graph-mode inference wrapper: calling the model directly avoids predict()'s per-call Python
+        #batching overhead, and reduce_retracing stops changing batch sizes from retriggering tracing
+        if xla == True:
+            #the fixed signature keeps dynamic batch sizes from retracing; XLA still recompiles once
+            #per distinct batch shape, which the fixed batch loop below keeps to at most two shapes
+            if self.verbose > 0:
+                print('Compiling the model with XLA (the first batch will be slow)')
+            sig = [tf.TensorSpec([None,None,None,1],tf.float32)]
+            self._infer = tf.function(lambda x: self.model(x,training=False),input_signature=sig,jit_compile=True)
+        else:
+            self._infer = tf.function(lambda x: self.model(x,training=False),reduce_retracing=True)
+
+        #Prevents issue where model doesn't like datasets with shapes different to the training set:
+        _ = self._infer(tf.ones((1,16,16,1)))
+
+        if self.verbose > 0:
+            print('Applying model:')
+        if len(self.flux.shape) == 3:
+            self.flux = np.expand_dims(self.flux,-1)
+        x = tf.convert_to_tensor(self.flux,dtype=tf.float32)
+
+        #infer in fixed-size batches into a preallocated output so a long frame stack never
+        #materialises a second full-size tensor, and device copies overlap with compute per batch;
+        #the grid is pinned to float32 so thresholding never runs at reduced precision
+        probe = self._infer(x[:1]).numpy()
+        self.y = np.empty((len(self.flux),)+probe.shape[1:],dtype=np.float32)
+        for b in range(0,len(self.flux),self.batch_size):
+            self.y[b:b+self.batch_size] = self._infer(x[b:b+self.batch_size]).numpy()
+
+
+    def quantize_model(self,frames=None,int8_activations=False):
+        """
+        Convert the loaded model to TFLite with post-training quantization and use it for all
+        subsequent calls to SourceDetect.apply_model. By default the weights are quantized to INT8
+        while activations stay float32 (dynamic-range quantization), which quarters the weight
+        bandwidth with no measurable change to the detection grid on the example frame. Full INT8
+        activation quantization is available as an opt-in, but the dynamic range of TESS fluxes
+        does not fit an 8 bit activation grid well so detections degrade noticeably
+
+        Parameters
+        ----------
+        frames : None or array (default None)
+            calibration images when int8_activations is True, which must match the model's
+            build-time input size; if None then crops of that size centred on strong flux
+            excursions (|flux| > 10) are taken from self.flux so the quantization grid preserves
+            prf peaks
+
+        Options
+        -------
+        int8_activations : bool (default False)
+            if True then quantize the activations to INT8 as well, calibrated on the
+            representative images described above
+
+        Outputs
+        -------
+        interpreter : tf.lite.Interpreter
+            the quantized model applied by SourceDetect.apply_model from now on
+        """
+
+        if len(self.flux.shape) == 3:
+            self.flux = np.expand_dims(self.flux,-1)
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if int8_activations == True:
+            if frames is None:
+                #the converter traces the model at its build-time input size (16x16 for the default
+                #model), so full-resolution frames cannot be fed to the calibrator; calibrate on
+                #crops of that size centred on pixels with strong flux excursions instead
+                ih, iw = self.model.input_shape[1], self.model.input_shape[2]
+                flagged = np.argwhere(np.abs(self.flux[...,0]) > 10)
+                if len(flagged) == 0:
+                    flagged = np.array([[a,self.flux.shape[1]//2,self.flux.shape[2]//2] for a in range(len(self.flux))])
+                flagged = flagged[::max(1,len(flagged)//100)][:100]
+                crops = []
+                for a, py, px in flagged:
+                    y0 = min(max(py-ih//2,0),self.flux.shape[1]-ih)
+                    x0 = min(max(px-iw//2,0),self.flux.shape[2]-iw)
+                    crops.append(self.flux[a,y0:y0+ih,x0:x0+iw])
+                frames = np.asarray(crops)
+            frames = np.asarray(frames,dtype=np.float32)
+            converter.representative_dataset = lambda: ([frames[i:i+1]] for i in range(len(frames)))
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        self.interpreter = tf.lite.Interpreter(model_content=converter.convert())
+        self.interpreter.allocate_tensors()
+        return self.interpreter
+
+
+    def _infer_tflite(self,x):
+        """Runs one batch through the quantized interpreter built by SourceDetect.quantize_model"""
+        inp = self.interpreter.get_input_details()[0]
+        out = self.interpreter.get_output_details()[0]
+        self.interpreter.resize_tensor_input(inp['index'],x.shape)
+        self.interpreter.allocate_tensors()
+        self.interpreter.set_tensor(inp['index'],x)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(out['index'])
+
+
+    def close_detect(self):
+        """
+        Identifies any groups of object detections that are in close proximity to one another (potential double detections or close sources)
+        
+        Outputs
+        -------
+        close_sources : list
+            positions (as tuples) of detections within close proximity to each other across all images
+        close_sources_by_frame : list
+            lists of positions (as tuples) of detections within close proximity to each other detected per image
+        """
+        
+        self.close_sources, self.close_sources_by_frame = [], []
+
+        for s in range(0,len(self.sources_by_frame)):
+            _close_sources = []
+
+            if len(self.sources_by_frame[s]) > 1:
+                #enumerate only the genuinely close pairs (Chebyshev distance <= 2) with a KD-tree instead
+                #of comparing every pair in Python, then let connected components do the transitive merging
+                pts = np.asarray(self.sources_by_frame[s])
+                pairs = cKDTree(pts).query_pairs(r=2,p=np.inf,output_type='ndarray')
+
+                if len(pairs) > 0:
+                    n = len(pts)
+                    adjacency = csr_matrix((np.ones(len(pairs)),(pairs[:,0],pairs[:,1])),shape=(n,n))
+                    n_comp, labels = connected_components(adjacency,directed=False)
+                    groups = [[] for _ in range(n_comp)]
+                    for i in range(n):
+                        groups[labels[i]].append(self.sources_by_frame[s][i])
+                    _close_sources = [sorted(group) for group in groups if len(group) > 1]
+
+            for i in range(0,len(_close_sources)):
+                self.close_sources.append(_close_sources[i])
+
+            self.close_sources_by_frame.append(_close_sources)
+
+
+    def unique_detect(self):
+        """
+        Identifies all guaranteed unique detections in each TESS image (detections not in close proximity to any others plus one detection from each grouping from SourceDetect.close_detect) 
+        
+        Outputs
+        -------
+        unique_sources : list
+            list of positions (as tuples) of every guaranteed unique detection in each image
+        """
+        
+        try:
+            self.close_sources_by_frame = self.close_sources_by_frame
+        except:
+            self.close_detect()
+
+        self.unique_sources = []
+        for s in range(0,len(self.sources_by_frame)):
+            if len(self.close_sources_by_frame[s])>0:
+                #every group member except the first is a potential double detection, so collect the
+                #non-representatives into a set and keep whatever is not in it
+                nonrep = set()
+                for group in self.close_sources_by_frame[s]:
+                    nonrep.update(group[1:])
+
+                self.unique_sources.append([p for p in self.sources_by_frame[s] if p not in nonrep])
+
+            else:
+                self.unique_sources.append(self.sources_by_frame[s])
+
+
+    def detect(self,threshold=None,grid_size=4,close=True,unique=False):
+        """
+        Documents all potential sources detected by the ML model in each image, their potential variability and whether they are in close proximity to any other detections
+        
+        Parameters
+        ----------
+        threshold : float (default 0.8)
+            minimum probability of being a true source (according to the ML model) required for detections to be boxed in the plot
+        grid_size : int (default 4)
+            ratio between image size and mask size (pixel area of potential detection sites)
+        close : bool (default True)
+            if True then document all grouping of detections in each frame in close proximity to other detections (keep True if you want analysis tables to work)
+        unique : bool (default False)
+            if True then document all guaranteed unique detections (detections not in close proximity to any others plus one detection from each grouping from SourceDetect.close_detect)
+        
+        Outputs
+        -------
+        sources : list
+            positions (as tuples) of every source detected in every image
+        sources_by_frame : list
+            lists of positions (as tuples) of every source detected per image
+        to_plot : list
+            list of tuples that can be used to plot detection results
+        psflike : list
+            probability of each detection being a PSF source
+        num_sources : list
+            number of sources detected in each image
+        frames : list
+            the frame (image index) each detection is found in (list of equal length to sources)
+        sourceID : dictionary
+            pairs each unique detection (by position) to a unique ID number
+        flux_sign : list
+            indicates whether each detection has positive or negative flux
+        variable_flag : dictionary
+            documents whether each unique detection (by position) was flagged for variability
+        """
+        
+        if threshold is None:
+            threshold = self.threshold
+        self.sources, self.sources_by_frame = [], []
+        self.to_plot, self.psflike = [], []
+        self.num_sources, self.frames = [], []
+        self.flux_sign, self.variable_flag = [], {}
+        id_counter = count()
+        self.sourceID = defaultdict(lambda: next(id_counter))
+        if self.verbose > 0:
+            print('Performing object detection:')
+        for a in range(0,len(self.flux)):
+            flux_a = self.flux[a]
+            i, j = self.y[a].shape[0], self.y[a].shape[1]
+            numb_sources = 0
+            positions = []
+            to_plot_ = []
+
+            #Ignore all detections with low probability and those likely to be 'trash' or 'fake' sources:
+            #the per-cell predicates are evaluated as masks over the whole detection grid in a few numpy
+            #passes so the Python loop below only visits surviving candidates
+            probs = self.y[a][:,:,0]
+            x1s, y1s = np.round(self.y[a][:,:,1]), np.round(self.y[a][:,:,2])
+            x2s, y2s = self.y[a][:,:,3], self.y[a][:,:,4]
+            brights, dims = self.y[a][:,:,5], self.y[a][:,:,6]
+            trashs, fakes = self.y[a][:,:,7], self.y[a][:,:,8]
+
+            #the fake margin only rejects when it is not a 'close call' (those are usually genuine detections)
+            keep = np.logical_and.reduce((probs >= threshold,
+                                          ~(fakes > 0.8),
+                                          ~((brights < 0.6) & (dims < 0.6) & (((brights < 0.5) & (dims < 0.5)) | (fakes > 0.2))),
+                                          ~((trashs > brights) & (trashs > dims)),
+                                          ~((fakes > brights) & (fakes > dims) & ((fakes-brights > 0.2) | (fakes-dims > 0.2))),
+                                          ~((np.abs(x2s) > 6) | (np.abs(y2s) > 6))))
+
+            # pxs, pys = (mxg * grid_size) + x1s, (myg * grid_size) + y1s
+            mxg, myg = np.meshgrid(np.arange(j), np.arange(i))
+            pxs = mxg*grid_size + x1s%grid_size
+            pys = myg*grid_size + y1s%grid_size
+
+            #gather the clamped candidate coordinates so the flux-window filters can run over the whole
+            #frame in one compiled pass (a single clip keeps the 2 pixel border margin)
+            candidates = np.argwhere(keep.T)
+            cand_pys = np.clip(pys.T[keep.T],2,self.flux.shape[1]-3)
+            cand_pxs = np.clip(pxs.T[keep.T],2,self.flux.shape[2]-3)
+
+            #Final filters for any obvious false detections on background fluctuations or overexposures;
+            #the survivors are selected once so the loop below touches nothing that was rejected
+            good = _flux_window_filter(flux_a[:,:,0],cand_pys.astype(np.int64),cand_pxs.astype(np.int64))
+            candidates = candidates[good]
+            cand_pys, cand_pxs = cand_pys[good], cand_pxs[good]
+
+            for c in range(len(candidates)):
+                mx, my = candidates[c]
+                channels = self.y[a][my][mx]
+                prob, x1, y1, x2, y2, bright, dim, trash, fake = channels
+                px, py = cand_pxs[c], cand_pys[c]
+
+                numb_sources += 1
+                sizes = [2,1]
+                for size in sizes:
+                    intpy = int(py + 0.5); intpx = int(px + 0.5)
+                    cut = np.abs(flux_a[intpy-size:intpy+size+1,intpx-size:intpx+size+1])
+                    if np.nansum(cut) > 0.95:
+                        cm = center_of_mass(cut)
+                        py = py+(cm[0]-size);px = px+(cm[1]-size)
+                #smax = np.where(np.abs(self.flux[a][int(py)-1:int(py)+2,int(px)-1:int(px)+2,0])==np.max(np.abs(self.flux[a][int(py)-1:int(py)+2,int(px)-1:int(px)+2,0])))
+                #print(smax)
+                # smax = np.where(np.abs(self.flux[a][int(py-y2/2):int(py+y2/2+1),int(px-x2/2):int(px+x2/2+1),0])==np.max(np.abs(self.flux[a][int(py-y2/2):int(py+y2/2+1),int(px-x2/2):int(px+x2/2+1),0])))
+                # smax_i = (int(py)+smax[0][0]-1,int(px)+smax[1][0]-1)
+                smax_i = (py,px)
+                try:
+                    if (smax_i not in positions) & np.isfinite(py) & np.isfinite(px):
+                        to_plot_.append((prob,smax_i[1],smax_i[0],x2,y2))
+                        positions.append(smax_i)
+                        self.sources.append(smax_i)
+                        self.psflike.append(prob)
+                        self.frames.append(a)
+                        self.sourceID[smax_i] #auto-assigns the next ID the first time a position is seen
+
+                        #a source whose bright/dim classification flips between frames is flagged as variable
+                        prev = self.variable_flag.setdefault(smax_i,1*(bright>dim))
+                        if prev is not True and prev != 1*(bright>dim):
+                            self.variable_flag[smax_i] = True
+
+                        if flux_a[int(py),int(px)] > 0:
+                            self.flux_sign.append(1)
+                        else:
+                            self.flux_sign.append(-1)
+                except:
+                    pass
+            self.to_plot.append(to_plot_)
+            self.sources_by_frame.append(sorted(positions))
+            self.num_sources.append(numb_sources)
+
+        for i in self.variable_flag.keys():
+            if self.variable_flag[i] is not True:
+                self.variable_flag[i] = 'unsure'
+
+        #column-wise (SoA) view of the parallel per-detection lists so the result tables can be
+        #built from array columns instead of re-zipping tuples per row
+        pos = np.asarray(self.sources,dtype=float).reshape(-1,2)
+        self._detections = pd.DataFrame({'ycentroid':pos[:,0],'xcentroid':pos[:,1],'frame':self.frames,
+                                         'psflike':self.psflike,'flux_sign':self.flux_sign})
+
+        if close == True:
+            self.close_detect()
+        if unique == True:
+            self.unique_detect()
+        if self.verbose > 0:
+            print('Object detection complete')
+
+
+    def get_flux(self,analyse=False,position=None,frame=None):
+        """
+        Creates a list of the fluxes of each potential source detected by the model or provides the flux at a specified position
+        
+        Parameters
+        ----------
+        analyse : bool (default False)
+            if True then document flux or every detection in every image
+        position : None or tuple (default None)
+            if analyse is False then this specifies the position of the detection
+        frame : None or int (default None)
+            if analyse if False then this specifies the frame (image index) with the detection
+        
+        Outputs
+        -------
+        source_flux : list
+            flux of every detection in every image (only output if analyse is True)
+        """
+        
+        if analyse == True:
+            if len(self.sources) == 0:
+                self.source_flux = []
+                return
+            # ind = np.where(np.array(self.to_plot[self.frames[s]])[1:3] == [self.sources[s][1],self.sources[s][0]])[0]
+            # aper = RA(positions=(self.sources[s]),w=int(self.to_plot[self.frames[s]][ind][3]+1),h=int(self.to_plot[self.frames[s]][ind][4]+1))
+            # self.source_flux.append(aper.do_photometry(self.flux[self.frames[s]][:,:,0])[0][0])
+            #gather every 3x3 window in one fancy-indexing pass instead of summing per source in Python
+            pos = np.asarray(self.sources)
+            frames = np.asarray(self.frames,dtype=np.intp)
+            iys = np.clip((pos[:,0]+0.5).astype(np.intp),1,self.flux.shape[1]-2)
+            ixs = np.clip((pos[:,1]+0.5).astype(np.intp),1,self.flux.shape[2]-2)
+            offs = np.arange(-1,2)
+            windows = self.flux[frames[:,None,None],iys[:,None,None]+offs[None,:,None],ixs[:,None,None]+offs[None,None,:],0]
+            self.source_flux = list(windows.sum(axis=(1,2)))
+
+        else:
+            try:
+                print(f'Flux at position {position} in frame{frame}: {self.flux[frame,position[0],position[1]]}')
+            except:
+                print('Please specify the position and frame of the object when calling this method')
+
+
+    def group_and_id(self):
+        """
+        Identify the full groups of detections in close proximity across all images, assign each group a number, 
+        and document the number of detecitons at each (x,y) position across all images
+        
+        Outputs
+        -------
+        groups : list
+            lists of positions (as tuples) of detections in close proximity to each other across all frames 
+        groupID : dictionary
+            mapping between each potential detection and a group ID number (ID of -1 for detections not in a group)
+        n_detections : dictionary
+            mapping between the position of each potential detected source and the number of detections across all images    
+        """
+        
+        def group(close_sources):
+            """
+            Similar to SourceDetect.close_detect but across all images to obtain complete groupings of potential sources
+
+            Parameters
+            ----------
+            close_sources : list
+                lists of positions (as tuples) of detections in close proximity to each other in each frame separately
+
+            Returns
+            -------
+            result : list
+                lists of positions (as tuples) of detections in close proximity to each other across all frames
+            """
+
+            #chain each sublist into sparse adjacency edges and let one connected_components call do the
+            #union-find in compiled code (also avoids the recursion depth of the old find implementation)
+            index = {}
+            for sublist in close_sources:
+                for coord in sublist:
+                    if coord not in index:
+                        index[coord] = len(index)
+            if len(index) == 0:
+                return []
+
+            rows, cols = [], []
+            for sublist in close_sources:
+                for i in range(len(sublist) - 1):
+                    rows.append(index[sublist[i]])
+                    cols.append(index[sublist[i+1]])
+
+            adjacency = csr_matrix((np.ones(len(rows)),(rows,cols)),shape=(len(index),len(index)))
+            n_comp, labels = connected_components(adjacency,directed=False)
+            result = [[] for _ in range(n_comp)]
+            for coord, idx in index.items():
+                result[labels[idx]].append(coord)
+            return result
+        
+        def IDassign(groups,positions):
+            """
+            Assign a group (close proximity detections) ID number, or lack thereof, to every detections across all images
+            
+            Parameters
+            ----------
+            groups : list
+                list of lists containing positions of detections in close proximity to each other across all images
+            positions : list 
+                positions (as tuples) of every detection across all images
+            
+            Returns
+            -------
+            result_dict : dictionary
+                mapping between each potential detection and a group ID number (ID of -1 for detections not in a group)
+            """
+            id_map = {tuple(sorted(group)): idx for idx, group in enumerate(groups)}
+            position_to_id = {}
+
+            for group, group_id in id_map.items():
+                for coord in group:
+                    position_to_id[coord] = group_id
+
+            result_dict = {}
+            for coord in positions:
+                result_dict[coord] = position_to_id.get(coord, -1)
+
+            return result_dict
+
+        def get_num_detections(detections):
+            """
+            Determines the number of detections for potential sources across each image
+            
+            Parameters
+            ----------
+            detections : list 
+                positions (as tuples) of every detection across all images
+            
+            Returns
+            -------
+            n_detections : dictionary
+                mapping between the position of each potential detected source and the number of detections across all images    
+            """
+            
+            n_detections = {}
+            for i in detections:
+                if i in n_detections:
+                    n_detections[i] += 1
+                else:
+                    n_detections[i] = 1
+            return n_detections
+
+        self.groups = group(self.close_sources)
+        self.groupID = IDassign(self.groups,self.sources)
+        self.n_detections = get_num_detections(self.sources)
+
+
+    def preview(self,frame=0,do_cut=False):
+        """
+        Plots a specified image prior to object detection; can also apply a cut to the images via SourceDetect.cut
+        
+        Parameters
+        ----------
+        frame : int (default 0)
+            frame (image index) to be plotted 
+        do_cut : bool (default False)
+            if True then provide user prompt to apply a cut to the images via SourceDetect.cut 
+        
+        Outputs
+        -------
+        issues : bool
+            if True then there are user identifies issues with the flux file and the object detection process will be cancled
+        """
+        
+        plt.figure()
+        plt.imshow(self.flux[frame],vmin=-10,vmax=10)
+        plt.show()
+        issues = ''
+        while issues.lower() not in ['yes','no']:
+            input('Are there any issues with the image below (reply "yes" or "no"): ')
+        if issues.lower() == 'yes':
+            self.issues = True
+        if do_cut == True:
+            cut = input('Would you like to make a cut to the images (type "yes" to cut): ')
+            if cut.lower() == 'yes':
+                self.cut()
+
+
+    def resultdf(self,update=False,save=False):
+        """
+        Creates output tables summarising the full object detection process
+        
+        Parameters
+        ----------
+        update : bool (default False)
+            if True then update the events table rather than redefining both (only used from with in SourceDetect.combine_groups)
+        
+        Outputs
+        -------
+        result : pd.Dataframe
+            summary table of detections across all images
+        events : pd.Dataframe
+            summary table of potential sources (detections unique to each position) across all images
+        """
+        
+        if len(self.sources) > 0:
+            if update == False:
+                if self.verbose > 0:
+                    print('Collecting results:')
+                det = self._detections
+                self.result = pd.DataFrame(data={'xcentroid':det['xcentroid'],'ycentroid':det['ycentroid'],'flux':self.source_flux,'frame':det['frame']})
+                #build the (y,x) lookup key once and use Series.map, which runs at C speed rather than
+                #calling a Python lambda per row like apply(axis=1)
+                key = pd.Series(list(zip(self.result['ycentroid'],self.result['xcentroid'])))
+                self.result['n_detections'] = key.map(self.n_detections).values
+                self.result['objid'] = key.map(self.sourceID).values
+                self.result['group'] = key.map(self.groupID).values
+                self.result['flux_sign'] = det['flux_sign'].values
+                self.result['psflike'] = det['psflike'].values
+                self.result['xint'] = np.round(det['xcentroid'].values).astype('int')
+                self.result['yint'] = np.round(det['ycentroid'].values).astype('int')
+                self.result.drop(self.result[(self.result.flux>0) & (self.result.flux_sign=='negative')].index)
+                self.result.drop(self.result[(self.result.flux<0) & (self.result.flux_sign=='positive')].index)
+
+            self.events = self.result.drop_duplicates(subset='objid').drop(columns=['flux','frame','flux_sign']).reset_index()
+            self.result['abs_target'] = self.result['flux'].abs()
+            ekey = pd.Series(list(zip(self.events['ycentroid'],self.events['xcentroid'])),index=self.events.index)
+            self.events['variability'] = ekey.map(self.variable_flag)
+
+            #flux of each object's strongest detection (the old row-wise lookup returned idxmax's row label rather than the flux itself)
+            max_flux = self.result.loc[self.result.groupby('objid')['abs_target'].idxmax()].set_index('objid')['flux']
+            self.result = self.result.drop(columns=['abs_target'])
+            self.events['max_flux'] = self.events['objid'].map(max_flux)
+
+            frame_span = self.result.groupby('objid')['frame'].agg(['min','max'])
+            self.events['start_frame'] = self.events['objid'].map(frame_span['min'])
+            self.events['end_frame'] = self.events['objid'].map(frame_span['max'])
+            self.events = self.events.drop(columns=['index'])
+            if self.save:
+                self.result.to_csv(f'{self.savepath}/{self.savename}/detected_sources')
+                self.events.to_csv(f'{self.savepath}/{self.savename}/detected_events')
+
+
+    
+    def combine_groups(self):
+        """
+        Reduce the result and events tables from SourceDetect.resultdf to only include the detection/source from each group with the largest flux 
+        (shows the minimum unique detections across all images)
+        
+        Outputs
+        -------
+        result : pd.Dataframe
+            summary table containing positions, flux, object ID, etc of all guaranteed unique detections across all images
+        events : pd.Dataframe
+            summary table containing positions, flux, frame duration, etc of all guaranteed unique potential sources (detections unique to each position) across all images
+        """
+        
+        self.result['abs_target'] = self.result['flux'].abs()
+        mask = self.result['group'].isin([-1])
+        excluded = self.result[mask]
+        included = self.result[~mask]
+
+        idx = included.groupby(['group','frame'])['abs_target'].idxmax()
+        filtered = self.result.loc[idx]
+        df_result = pd.concat([filtered, excluded])
+        df_result = df_result.drop(columns=['group','abs_target'])
+
+        self.result = df_result.reset_index(drop=True)
+
+        to_plot = []
+        for i in range(0,np.max(self.frames)+1):
+            to_plot_ = []
+            for c in range(0,len(self.to_plot[i])):
+                if self.to_plot[i][c][1:3] in self.result[['xcentroid','ycentroid']].values:
+                    to_plot_.append(self.to_plot[i][c])
+            to_plot.append(to_plot_)
+        self.to_plot = to_plot 
+
+        self.resultdf(update=True)
+
+
+    def analyse(self,train=False,threshold=0.8):
+        """
+        Build, compile and train a ML model then perform full object detection analysis and tablate the results
+        
+        Parameters
+        ----------
+        train : bool (default False)
+            if true then the ML model is trained on the Xtrain dataset (only use if calling an untrained custom model)
+        threshold : float (default 0.8)
+            minimum probability of being a true source (according to the ML model) required for detections to be boxed in the plot
+        """
+        
+        self.apply_model(train=train)
+        self.detect(threshold=threshold)
+        self.get_flux(analyse=True)
+        self.group_and_id()
+        self.resultdf()
+        self.combine_groups()
+
+
+    def check_region(self,xrange,yrange,frame=0):
+        """
+        Establishes a subregion of the images to be zoomed in on when plotting with SourceDetect.plot
+        
+        Parameters
+        ----------
+        xrange : tuple
+            lower and upper x-axis limits for the zoomed region desired for plotting 
+        yrange : tuple
+            lower and upper y-axis limits for the zoomed region desired for plotting 
+        frame : int (default 0)
+            desired frame (image index) to be plotted in the specified zoomed region
+        
+        Outputs
+        -------
+        zoom : list
+            positions (as tuples) of detections within the specified frame and zoomed region
+        zoom_range : list
+            bounds of the zoomed region: of the form [ymin,ymax,xmin,xmax]
+        """
+        
+        self.zoom = []
+        self.zoom_range = [yrange[0],yrange[1],xrange[1],xrange[0]]
+        if len(self.sources_by_frame[frame]) > 0:
+            #select in-region detections with one boolean mask; the old per-source `in range(...)`
+            #check always failed for fractional centroids (and indexed close_sources by frame)
+            pts = np.asarray(self.sources_by_frame[frame])
+            mask = (pts[:,0] >= yrange[0]) & (pts[:,0] < yrange[1]) & (pts[:,1] >= xrange[0]) & (pts[:,1] < xrange[1])
+            self.zoom = [tuple(p) for p in pts[mask]]
+
+
+    def plot(self,which_plots=['sources'],frame=0,compare=False,zoom=False,saveplots=False,savepath=None,savename=None,dpi=750):
+        """
+        Produces output plots illustrating the object detection process with identification boxes.
+        Zoom currently only available for the close and unique sources plots
+        
+        Parameters
+        ----------
+        which_plots : list (default ['sources'])
+            one or more types of image plots to be produced out of the following options for identifying detections:
+                - "sources" : all detections within a particular frame 
+                - "close" : all detections in close proximity to other detections within a particular frame 
+                - "unique" : all guaranteed unique detections (only one from each grouping included) within a particular frame  
+                - "nobox" : the specified frame without any object detection boxes plotted on top
+        frame : int (default 0)
+            the frame (image index) to be plotted with speficied detections identified (see which_plots above)
+        compare : bool (default False)
+            if True then the plots specified by 'which_plots' will be displayed using matplotlib.pyplot.subplots rather than individually
+        zoom : bool (default False)
+            if True then only plot the region specified when calling SourceDetect.check_region (this must be done first)    
+        saveplots : bool (default False)
+            if True then save all plots to the location defined by SourceDetect.savepath
+        savepath : str or None (default None)
+            location to save any output models, tables, and figures will be saved (if None then the preexisting savepath is used)
+        savename : str or None (default None)
+            beginning of the savename for any plots made (if None then the preexisting savename is used)
+        dpi : int (default 750)
+            resolution of any saved plots (lower this to speed up rasterisation of large frames)
+        """
+        
+        if zoom == True:
+            try:
+                self.zoom = self.zoom
+            except:
+                print('self.zoom, the region to be plotted, needs to be defined first by calling SourceDetect.check_region')
+        
+        if savepath != None:
+            self.savepath = savepath
+        if savename != None:
+            self.savename = savename
+                
+
+        def get_color_by_probability(p):
+            """
+            Specifies the box colour plotted for each source detection based on the confidence of the model.
+            This is only important when the threshold is lowered to display uncertain objects in the plots
+            
+            Parameters
+            ----------
+            p : float
+                the probability of a detection being a real source
+            
+            Returns
+            -------
+            colour : str
+                colour of the box to be plotted over the detected source (red, yellow, orange, or green)
+            """
+            
+            if p < 0.3:
+                return 'red'
+            if p < 0.8:
+                return 'yellow'
+            return 'green'
+        
+        
+        def plotter(ax,p,zoom=False):
+            """
+            Performs the plotting for SourceDetect.plot
+            
+            Parameters
+            ----------
+            ax : matplotlib.axes._axes.Axes
+                the subplot to be plotted on for this iteration
+            p : str
+                ones of the arguments from 'which_plots' defined when calling SourceDetect.plot
+            zoom : bool (default False)
+                if True then only plot the region specified when calling SourceDetect.zoom (this must be done first)            
+            """
+            
+            if p == 'sources':
+                ax.set_title('Detected Sources')
+
+                #batch the boxes into one collection so matplotlib manages a single artist rather
+                #than one per detection
+                boxes = [Rectangle((int(px-x2/2),int(py-y2/2)),int(x2+2),int(y2+2)) for _, px, py, x2, y2 in self.to_plot[frame]]
+                colors = [get_color_by_probability(prob) for prob, _, _, _, _ in self.to_plot[frame]]
+                ax.add_collection(PatchCollection(boxes,edgecolors=colors,facecolor='none',lw=1))
+
+                if zoom == True:
+                    ax.set_ylim(self.zoom_range[0],self.zoom_range[1])
+                    ax.set_xlim(self.zoom_range[2],self.zoom_range[3])
+
+                plt.show()
+
+            elif p == 'close':
+                ax.set_title('Close Proximity Detections')
+
+                boxes = [Rectangle((int(x-2),int(y-2)),4,4) for group in self.close_sources for y, x in group]
+                ax.add_collection(PatchCollection(boxes,edgecolor='green',facecolor='none',lw=1))
+                
+                if zoom == True:
+                    ax.set_ylim(self.zoom_range[0],self.zoom_range[1])
+                    ax.set_xlim(self.zoom_range[2],self.zoom_range[3])
+                
+                plt.show()
+
+            elif p == 'unique':
+                ax.set_title('Definite Unique Detections')
+
+                boxes = [Rectangle((int(j-2),int(i-2)),4,4) for i, j in self.unique_sources[frame]]
+                ax.add_collection(PatchCollection(boxes,edgecolor='green',facecolor='none',lw=1))
+                
+                if zoom == True:
+                    ax.set_ylim(self.zoom_range[0],self.zoom_range[1])
+                    ax.set_xlim(self.zoom_range[2],self.zoom_range[3])
+                                    
+                plt.show()
+
+            elif p == 'nobox':
+                ax.set_title('Original Frame')
+                plt.show()
+
+            else:
+                print('Invalid plot type (options are "sources", "close", "unique", "nobox", or a combination of these as a list or tuple)')
+    
+
+        if compare == False:
+            plotnames = {'sources':'detected_sources','close':'close_objects','unique':'unique_objects','nobox':'original_frame'}
+            for p in which_plots:
+                fig, ax = plt.subplots()
+                im = ax.imshow(self.flux[frame],vmin=-10,vmax=10)
+                fig.colorbar(im)
+                plotter(ax,p,zoom)
+                if saveplots == True:
+                    if zoom == True:
+                        plt.savefig(f'{self.savepath}/{self.savename}_{plotnames[p]}_zoomed', dpi=dpi)
+                    else:
+                        plt.savefig(f'{self.savepath}/{self.savename}_{plotnames[p]}', dpi=dpi)
+
+        else:
+            fig, ax = plt.subplots(1,len(which_plots),figsize=(10,10))
+            for p in range(0,len(which_plots)):
+                im = ax[p].imshow(self.flux[frame],vmin=-10,vmax=10)
+                plotter(ax[p],which_plots[p],zoom)
+            cbar_ax = fig.add_axes([0.93, 0.3, 0.022, 0.38])
+            fig.colorbar(im, cax=cbar_ax)
+            if saveplots == True:
+                if zoom == True:
+                    plt.savefig(f'{self.savepath}/{self.savename}_object_detection_zoomed', dpi=dpi)
+                else:
+                    plt.savefig(f'{self.savepath}/{self.savename}_object_detection', dpi=dpi)
+
+
+    def SourceDetect(self,flux=None,savepath=None,savename=None,train=None,do_cut=False,plot=False):
+        """
+        Perform object detection on a collection of TESS images/frames
+        
+        Parameters
+        ----------
+        flux : array or None (defualt None)
+            use this parameter to change the set of images being analysed rather than having to create a brand new SourceDetect object
+        savepath : str or None (default None)
+            location to save any output models, tables, and figures will be saved (if None then the preexisting savepath is used)
+        savename : str or None (default None)
+            beginning of the savename for any tables or plots made (if None then the preexisting savename is used)
+        train : bool (default False)
+            if true then the ML model is trained on the Xtrain dataset (only use if calling an untrained custom model)
+        do_cut : bool (default False)
+            if True then the TESS images are cut via a user prompt to specify the desired region to keep
+        plot : bool (default False)
+            if True then plot and save an example object detection plot on the first image/frame
+        """
+        
+        self.issues = False
+        if self.precheck == True:
+            self.preview(do_cut=do_cut)
+        if savepath !=None:
+            self.savepath = savepath
+        if savename != None:    
+            self.savename = savename
+        if type(train) == type(None):
+            train = self.train
+        else:
+            self.train = train
+        if self.issues == False:
+            if type(flux) != type(None):
+                self.flux = flux
+                if len(self.flux.shape) == 2:
+                    self.flux = np.expand_dims(self.flux,0)
+            self.analyse(train=train,threshold=self.threshold)
+        if self.verbose > 0:
+            print('Collection complete')
+        if plot == True:
+            self.plot(which_plots=['sources'],savepath=savepath,savename=savename)